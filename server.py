@@ -1,22 +1,46 @@
 import os
 import json
 import posixpath
+import re
 import urllib.parse
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from http.server import SimpleHTTPRequestHandler
 from socketserver import ThreadingTCPServer
 import time
 import sqlite3
+import queue
+import threading
 import urllib.request
 import urllib.error
 import tempfile
 import base64
+import hashlib
+import atexit
+import signal
+import socket
+import logging
+import argparse
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 try:
     from yt_dlp import YoutubeDL  # type: ignore
     YTDLP_AVAILABLE = True
 except Exception:
     YTDLP_AVAILABLE = False
 
+try:
+    import orjson  # Faster JSON encoding/decoding when installed
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import urllib3  # Installed with requests; enables keep-alive for remote fallback
+    URLLIB3_AVAILABLE = True
+except ImportError:
+    URLLIB3_AVAILABLE = False
+
 try:
     from ytmusicapi import YTMusic
     YTMUSIC_AVAILABLE = True
@@ -24,8 +48,12 @@ except ImportError:
     YTMUSIC_AVAILABLE = False
     print("Warning: ytmusicapi not installed. Using demo mode.")
 
+logger = logging.getLogger(__name__)
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()  # DEBUG, INFO, WARNING, ERROR
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(ROOT_DIR, 'wave_music.db')
+DB_POOL_SIZE = 8  # Idle SQLite connections kept open for reuse
 # Optional: external backend for fallback (disabled by default)
 REMOTE_BASE_URL = os.environ.get('REMOTE_BASE_URL')
 YTDLP_COOKIES_B64 = os.environ.get('YTDLP_COOKIES_B64')  # Base64-encoded Netscape cookie file
@@ -33,24 +61,107 @@ YTDLP_COOKIES_PATH = os.environ.get('YTDLP_COOKIES_PATH')  # Absolute path to co
 YTDLP_UA = os.environ.get('YTDLP_UA', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36')
 YTDLP_LANG = os.environ.get('YTDLP_LANG', 'en-US,en;q=0.9')
 YTMUSIC_HEADERS_B64 = os.environ.get('YTMUSIC_HEADERS_B64')  # Base64 of headers_auth.json
+AUDIO_CACHE_TTL = 600  # Seconds an extracted stream URL is reused when it has no expire= param
+AUDIO_EXPIRE_MARGIN = 60  # Stop serving a cached stream URL this long before it expires
+AUDIO_CACHE_MAXSIZE = 1024
+AUDIO_FAILURE_TTL = 60  # Seconds a failed extraction is remembered before retrying
+AUDIO_INFLIGHT_TIMEOUT = 30  # Seconds a request waits on another request's extraction
+YTM_CACHE_TTL = 1800  # Seconds album/artist/playlist metadata from YTMusic is reused
+YTM_CACHE_MAXSIZE = 1000
+LYRICS_CACHE_TTL = 6 * 3600  # Seconds fetched lyrics are reused
+LYRICS_MISS_TTL = 3600  # Seconds a "no lyrics" answer is reused
+LYRICS_CACHE_MAXSIZE = 1024
+SEARCH_CACHE_TTL = 120  # Seconds /api/search results and remote fallback responses are reused
+SEARCH_CACHE_MAXSIZE = 2048
+TRENDING_CACHE_TTL = 600  # Seconds the /api/trending chart is reused
+SERVER_MAX_WORKERS = int(os.environ.get('SERVER_MAX_WORKERS', '64'))  # Threads serving HTTP connections
+REQUEST_TIMEOUT = 30  # Seconds a connection may stay silent before its worker drops it
+# Set to 1 to let several server processes share the port (SO_REUSEPORT, Python 3.11+)
+SERVER_REUSE_PORT = os.environ.get('SERVER_REUSE_PORT') == '1'
+SEARCH_MULTI_FILTERS = ('songs', 'albums', 'artists', 'playlists', 'community_playlists')
+PLAYLIST_BATCH_MAX = 500  # Most songs /api/playlist/add-songs inserts in one transaction
+SEARCH_MULTI_TIMEOUT = 10  # Overall deadline in seconds for the search_multi fan-out
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after a TTL.
+
+    The TTL is per cache unless ``set`` is given one for the entry, and is
+    measured on the monotonic clock so wall-clock changes do not affect it.
+    Expired entries are dropped when looked up, and the least recently used
+    entry is evicted once the cache grows past ``maxsize``. Handlers run on
+    separate threads, so every access goes through a lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Any, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+# Extracted audio stream info keyed by videoId
+_AUDIO_CACHE = TTLCache(AUDIO_CACHE_MAXSIZE, AUDIO_CACHE_TTL)
+# Recent failed extractions keyed by videoId, so retries do not hit YouTube again
+_AUDIO_FAILURES = TTLCache(AUDIO_CACHE_MAXSIZE, AUDIO_FAILURE_TTL)
+# Extractions currently running, so concurrent requests can share one result
+_AUDIO_INFLIGHT: Dict[str, Future] = {}
+_AUDIO_INFLIGHT_LOCK = threading.Lock()
+# Converted album/artist/playlist responses keyed by (kind, id)
+_YTM_CACHE = TTLCache(YTM_CACHE_MAXSIZE, YTM_CACHE_TTL)
+# Serialized /api/lyrics responses keyed by videoId
+_LYRICS_CACHE = TTLCache(LYRICS_CACHE_MAXSIZE, LYRICS_CACHE_TTL)
+# /api/search results keyed by query; demo results are never stored
+_SEARCH_CACHE = TTLCache(SEARCH_CACHE_MAXSIZE, SEARCH_CACHE_TTL)
+# /api/trending results; the chart is the same for every visitor
+_TRENDING_CACHE = TTLCache(4, TRENDING_CACHE_TTL)
+# Successful remote fallback responses keyed by full URL
+_REMOTE_CACHE = TTLCache(SEARCH_CACHE_MAXSIZE, SEARCH_CACHE_TTL)
+_YTMUSIC: Optional['YTMusic'] = None
+_YTMUSIC_LOCK = threading.Lock()
+_YTDLP_OPTS: Optional[Dict[str, Any]] = None
+_YTDLP_OPTS_LOCK = threading.Lock()
+# One YoutubeDL per worker thread; instances are not safe to share across threads
+_YTDLP_LOCAL = threading.local()
+# Shared by all requests so search_multi does not start threads per call
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ytmusic-search')
 
 def init_database():
     """Initialize SQLite database for storing user data (fallback if Firebase not available)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute('''
+    conn = connect_db()
+    # WAL is persistent: readers no longer block the writer on every later connection
+    conn.execute('PRAGMA journal_mode=WAL')
+    # Create the whole schema in one transaction: a single commit, and servers
+    # starting at the same time take turns instead of interleaving statements
+    conn.executescript('''
+        BEGIN IMMEDIATE;
+        
+        -- Users table
         CREATE TABLE IF NOT EXISTS users (
             id TEXT PRIMARY KEY,
             email TEXT UNIQUE NOT NULL,
             name TEXT NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Liked songs table
-    cursor.execute('''
+        );
+        
+        -- Liked songs table
         CREATE TABLE IF NOT EXISTS liked_songs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id TEXT NOT NULL,
@@ -62,11 +173,9 @@ def init_database():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id),
             UNIQUE(user_id, video_id)
-        )
-    ''')
-    
-    # Playlists table
-    cursor.execute('''
+        );
+        
+        -- Playlists table
         CREATE TABLE IF NOT EXISTS playlists (
             id TEXT PRIMARY KEY,
             user_id TEXT NOT NULL,
@@ -74,11 +183,9 @@ def init_database():
             description TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-    
-    # Playlist songs table
-    cursor.execute('''
+        );
+        
+        -- Playlist songs table
         CREATE TABLE IF NOT EXISTS playlist_songs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             playlist_id TEXT NOT NULL,
@@ -90,45 +197,172 @@ def init_database():
             position INTEGER NOT NULL,
             added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (playlist_id) REFERENCES playlists (id)
-        )
+        );
+        
+        -- Indexes for the per-user and per-playlist lookups done by the API handlers
+        CREATE INDEX IF NOT EXISTS idx_liked_user
+        ON liked_songs (user_id, created_at DESC);
+        -- (user_id, created_at) also serves the ORDER BY in /api/user/playlists
+        CREATE INDEX IF NOT EXISTS idx_playlists_user_created
+        ON playlists (user_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_playlist_songs_pos
+        ON playlist_songs (playlist_id, position);
+        
+        COMMIT;
     ''')
-    
-    conn.commit()
     conn.close()
 
+_DB_POOL: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def connect_db() -> sqlite3.Connection:
+    """Open a SQLite connection tuned for the API handlers"""
+    # Pooled connections live long enough for their statement cache to pay off
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    conn.executescript('''
+        PRAGMA synchronous=NORMAL;
+        PRAGMA cache_size=-20000;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA busy_timeout=5000;
+    ''')
+    return conn
+
+@contextmanager
+def get_db():
+    """Borrow a pooled SQLite connection, opening a new one if none are idle.
+
+    Connections are handed back to the pool afterwards so their page cache stays
+    warm across requests; any uncommitted transaction is rolled back first.
+    """
+    try:
+        conn = _DB_POOL.get_nowait()
+    except queue.Empty:
+        conn = connect_db()
+    try:
+        yield conn
+    finally:
+        try:
+            conn.rollback()
+            _DB_POOL.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            conn.close()
+
+def add_playlist_songs(conn: sqlite3.Connection, playlist_id: str, songs: List[Dict[str, Any]]) -> None:
+    """Append songs to the end of a playlist, in order, with a single commit"""
+    # Each row takes the next position in the same statement, so concurrent
+    # adds cannot pick the same slot
+    conn.executemany('''
+        INSERT INTO playlist_songs
+        (playlist_id, video_id, title, artist, thumbnail, duration, position)
+        VALUES (?, ?, ?, ?, ?, ?, (
+            SELECT COALESCE(MAX(position), 0) + 1
+            FROM playlist_songs
+            WHERE playlist_id = ?
+        ))
+    ''', [
+        (playlist_id, song['videoId'], song['title'],
+         song.get('artist'), song.get('thumbnail'),
+         song.get('duration'), playlist_id)
+        for song in songs
+    ])
+    conn.commit()
+
+# JSON keys for the columns selected by the user/playlist queries, in order
+_LIKED_SONG_KEYS = ('videoId', 'title', 'artist', 'thumbnail', 'duration')
+_USER_PLAYLIST_KEYS = ('id', 'name', 'description', 'createdAt', 'songCount')
+_PLAYLIST_SONG_KEYS = ('videoId', 'title', 'artist', 'thumbnail', 'duration', 'position')
+
+# ASCII bytes that are not letters; deleted before counting ASCII letters
+_ASCII_NON_ALPHA = bytes(b for b in range(128) if not chr(b).isalpha())
+_NON_ALPHA_RE = re.compile(r'[\W\d_]+')
+
+def get_query_param(query_string: str, key: str) -> str:
+    """Return one decoded query-string value ('' if absent) without parsing the rest.
+
+    Matches ``dict(parse_qsl(query_string)).get(key, '')``: the last occurrence
+    wins and empty values count as absent.
+    """
+    needle = key + '='
+    value = ''
+    i = query_string.find(needle)
+    while i >= 0:
+        end = query_string.find('&', i)
+        if i == 0 or query_string[i - 1] == '&':
+            raw = query_string[i + len(needle):] if end < 0 else query_string[i + len(needle):end]
+            if raw:
+                value = urllib.parse.unquote_plus(raw) if '%' in raw or '+' in raw else raw
+        if end < 0:
+            break
+        i = query_string.find(needle, end)
+    return value
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header value covers the given ETag"""
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag == etag or tag == 'W/' + etag:
+            return True
+    return False
+
+def json_dumps(data: Any) -> bytes:
+    """Serialize data to UTF-8 encoded JSON, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    # ASCII output takes the C encoder's fastest path and needs no UTF-8 encoding step
+    return json.dumps(data, separators=(',', ':')).encode('ascii')
+
+def json_loads(data: bytes) -> Any:
+    """Parse UTF-8 encoded JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def is_english_text(text: str) -> bool:
     """Check if text is primarily in English"""
-    if not text:
+    # str.isascii() is O(1); all-ASCII text always passes the ratio below
+    if not text or text.isascii():
         return True
     
     # Count English characters vs non-English characters
-    english_chars = sum(1 for c in text if c.isascii() and c.isalpha())
-    total_chars = sum(1 for c in text if c.isalpha())
-    
+    total_chars = len(_NON_ALPHA_RE.sub('', text))
     if total_chars == 0:
         return True
+    english_chars = len(text.encode('ascii', 'ignore').translate(None, _ASCII_NON_ALPHA))
     
     # Consider text English if more than 70% of alphabetic characters are ASCII
     return (english_chars / total_chars) > 0.7
 
+def _join_artist_names(artists: List[Dict[str, Any]]) -> str:
+    """Comma-separated names from a ytmusicapi artists list"""
+    return ', '.join([a['name'] for a in artists if a and a.get('name')])
+
+def _last_thumbnail_url(item: Dict[str, Any]) -> Optional[str]:
+    """URL of the last (largest) entry in an item's thumbnails list"""
+    thumbs = item.get('thumbnails')
+    return thumbs[-1].get('url') if thumbs else None
+
 def map_song_result(item: Dict[str, Any]) -> Dict[str, Any]:
     """Map YouTube Music API result to standardized format"""
-    video_id = item.get('videoId') or (item.get('navigationEndpoint', {}).get('watchEndpoint', {}).get('videoId'))
+    video_id = item.get('videoId')
+    if not video_id:
+        video_id = item.get('navigationEndpoint', {}).get('watchEndpoint', {}).get('videoId')
     title = item.get('title') or item.get('name', 'Unknown Title')
     
     # Handle artists
-    artists = item.get('artists') or []
+    artists = item.get('artists')
     artist = None
     if isinstance(artists, list) and artists:
-        artist = ', '.join([a.get('name') for a in artists if a and a.get('name')])
-    elif isinstance(item.get('artist'), str):
-        artist = item.get('artist')
+        artist = _join_artist_names(artists)
+    else:
+        artist_name = item.get('artist')
+        if isinstance(artist_name, str):
+            artist = artist_name
     
     # Handle duration
     duration = item.get('duration') or item.get('duration_seconds')
     if isinstance(duration, (int, float)):
-        mins, secs = divmod(int(duration), 60)
-        duration = f"{mins}:{secs:02d}"
+        seconds = int(duration)
+        duration = f"{seconds // 60}:{seconds % 60:02d}"
     
     # Handle thumbnails
     thumbs = item.get('thumbnails') or item.get('thumbnail') or []
@@ -147,6 +381,19 @@ def map_song_result(item: Dict[str, Any]) -> Dict[str, Any]:
         'thumbnail': thumb_url
     }
 
+_REMOTE_HEADERS = {
+    'Accept': 'application/json',
+    'User-Agent': 'WaveMusicServer/1.0'
+}
+_REMOTE_HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=16,
+    # urllib3 decompresses resp.data itself (brotli too, when installed)
+    headers=dict(_REMOTE_HEADERS, **urllib3.util.make_headers(accept_encoding=True)),
+    timeout=urllib3.Timeout(total=4),
+    retries=False
+) if URLLIB3_AVAILABLE else None
+
 def fetch_remote_json(path_with_query: str) -> Optional[Dict[str, Any]]:
     """Fetch JSON from external backend as a fallback when local YTMusic is unavailable.
 
@@ -155,17 +402,23 @@ def fetch_remote_json(path_with_query: str) -> Optional[Dict[str, Any]]:
     if not REMOTE_BASE_URL:
         return None
     url = REMOTE_BASE_URL.rstrip('/') + path_with_query
+    cached = _REMOTE_CACHE.get(url)
+    if cached is not None:
+        return cached
     try:
-        req = urllib.request.Request(
-            url,
-            headers={
-                'Accept': 'application/json',
-                'User-Agent': 'WaveMusicServer/1.0'
-            }
-        )
+        if _REMOTE_HTTP is not None:
+            # Pooled keep-alive connection: no new TCP/TLS handshake per call
+            resp = _REMOTE_HTTP.request('GET', url)
+            if resp.status == 200:
+                data = json_loads(resp.data)
+                _REMOTE_CACHE.set(url, data)
+                return data
+            return None
+        req = urllib.request.Request(url, headers=_REMOTE_HEADERS)
         with urllib.request.urlopen(req, timeout=4) as resp:
             if resp.getcode() == 200:
-                data = json.loads(resp.read().decode('utf-8'))
+                data = json_loads(resp.read())
+                _REMOTE_CACHE.set(url, data)
                 return data
     except urllib.error.HTTPError as e:
         # Quietly ignore remote fallback errors
@@ -176,75 +429,456 @@ def fetch_remote_json(path_with_query: str) -> Optional[Dict[str, Any]]:
         pass
     return None
 
+# YouTube video IDs are always 11 URL-safe base64 characters
+_VIDEO_ID_RE = re.compile(r'[A-Za-z0-9_-]{11}')
+# Community playlists whose title looks like a podcast/show
+_PODCAST_RE = re.compile(r'podcast|episode|show|radio', re.IGNORECASE)
+
 def get_demo_results(query: str) -> List[Dict[str, Any]]:
     """Return empty results when YTMusic is not available"""
     return []
 
-class YTMusicRequestHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        # Initialize YouTube Music API
-        if YTMUSIC_AVAILABLE:
-            headers_path = os.path.join(ROOT_DIR, 'headers_auth.json')
+# Sample lyrics for testing; a real implementation would use a lyrics API.
+# Synchronized lines are (text, startTime, endTime) tuples.
+_SAMPLE_LYRICS = {
+    'dQw4w9WgXcQ': {
+        'lyrics': '''Never gonna give you up
+Never gonna let you down
+Never gonna run around and desert you
+Never gonna make you cry
+Never gonna say goodbye
+Never gonna tell a lie and hurt you
+
+We've known each other for so long
+Your heart's been aching but you're too shy to say it
+Inside we both know what's been going on
+We know the game and we're gonna play it
+
+And if you ask me how I'm feeling
+Don't tell me you're too blind to see
+
+Never gonna give you up
+Never gonna let you down
+Never gonna run around and desert you
+Never gonna make you cry
+Never gonna say goodbye
+Never gonna tell a lie and hurt you
+
+We've known each other for so long
+Your heart's been aching but you're too shy to say it
+Inside we both know what's been going on
+We know the game and we're gonna play it
+
+And if you ask me how I'm feeling
+Don't tell me you're too blind to see
+
+Never gonna give you up
+Never gonna let you down
+Never gonna run around and desert you
+Never gonna make you cry
+Never gonna say goodbye
+Never gonna tell a lie and hurt you''',
+        'synchronized': [
+            ('Never gonna give you up', 0.0, 3.0),
+            ('Never gonna let you down', 3.0, 6.0),
+            ('Never gonna run around and desert you', 6.0, 10.0),
+            ('Never gonna make you cry', 10.0, 13.0),
+            ('Never gonna say goodbye', 13.0, 16.0),
+            ('Never gonna tell a lie and hurt you', 16.0, 20.0),
+            ('', 20.0, 22.0),  # Pause
+            ('We\'ve known each other for so long', 22.0, 26.0),
+            ('Your heart\'s been aching but you\'re too shy to say it', 26.0, 32.0),
+            ('Inside we both know what\'s been going on', 32.0, 36.0),
+            ('We know the game and we\'re gonna play it', 36.0, 40.0),
+            ('', 40.0, 42.0),  # Pause
+            ('And if you ask me how I\'m feeling', 42.0, 46.0),
+            ('Don\'t tell me you\'re too blind to see', 46.0, 50.0),
+            ('', 50.0, 52.0),  # Pause
+            ('Never gonna give you up', 52.0, 55.0),
+            ('Never gonna let you down', 55.0, 58.0),
+            ('Never gonna run around and desert you', 58.0, 62.0),
+            ('Never gonna make you cry', 62.0, 65.0),
+            ('Never gonna say goodbye', 65.0, 68.0),
+            ('Never gonna tell a lie and hurt you', 68.0, 72.0),
+            ('', 72.0, 74.0),  # Pause
+            ('We\'ve known each other for so long', 74.0, 78.0),
+            ('Your heart\'s been aching but you\'re too shy to say it', 78.0, 84.0),
+            ('Inside we both know what\'s been going on', 84.0, 88.0),
+            ('We know the game and we\'re gonna play it', 88.0, 92.0),
+            ('', 92.0, 94.0),  # Pause
+            ('And if you ask me how I\'m feeling', 94.0, 98.0),
+            ('Don\'t tell me you\'re too blind to see', 98.0, 102.0),
+            ('', 102.0, 104.0),  # Pause
+            ('Never gonna give you up', 104.0, 107.0),
+            ('Never gonna let you down', 107.0, 110.0),
+            ('Never gonna run around and desert you', 110.0, 114.0),
+            ('Never gonna make you cry', 114.0, 117.0),
+            ('Never gonna say goodbye', 117.0, 120.0),
+            ('Never gonna tell a lie and hurt you', 120.0, 124.0),
+            ('', 124.0, 130.0),  # Instrumental break
+            ('Never gonna give you up', 130.0, 133.0),
+            ('Never gonna let you down', 133.0, 136.0),
+            ('Never gonna run around and desert you', 136.0, 140.0),
+            ('Never gonna make you cry', 140.0, 143.0),
+            ('Never gonna say goodbye', 143.0, 146.0),
+            ('Never gonna tell a lie and hurt you', 146.0, 150.0),
+            ('', 150.0, 160.0),  # Extended instrumental
+            ('Never gonna give you up', 160.0, 163.0),
+            ('Never gonna let you down', 163.0, 166.0),
+            ('Never gonna run around and desert you', 166.0, 170.0),
+            ('Never gonna make you cry', 170.0, 173.0),
+            ('Never gonna say goodbye', 173.0, 176.0),
+            ('Never gonna tell a lie and hurt you', 176.0, 180.0),
+            ('', 180.0, 190.0),  # Final instrumental
+            ('Never gonna give you up', 190.0, 193.0),
+            ('Never gonna let you down', 193.0, 196.0),
+            ('Never gonna run around and desert you', 196.0, 200.0),
+            ('Never gonna make you cry', 200.0, 203.0),
+            ('Never gonna say goodbye', 203.0, 206.0),
+            ('Never gonna tell a lie and hurt you', 206.0, 213.0)
+        ]
+    },
+    '9bZkp7q19f0': {
+        'lyrics': '''This is the way
+I love it
+This is the way
+I love it
+
+I love it when you call me big poppa
+Throw your hands in the air if you's a true player
+I love it when you call me big poppa
+To the honies getting money playing niggas like dummies''',
+        'synchronized': [
+            ('This is the way', 0.0, 2.0),
+            ('I love it', 2.0, 4.0),
+            ('This is the way', 4.0, 6.0),
+            ('I love it', 6.0, 8.0)
+        ]
+    },
+    'kJQP7kiw5Fk': {
+        'lyrics': '''Despacito
+Quiero respirar tu cuello despacito
+Deja que te diga cosas al oído
+Para que te acuerdes si no estás conmigo
+
+Despacito
+Quiero desnudarte a besos despacito
+Firmar las paredes de tu laberinto
+Y hacer de tu cuerpo todo un manuscrito''',
+        'synchronized': [
+            ('Despacito', 0.0, 2.0),
+            ('Quiero respirar tu cuello despacito', 2.0, 5.0),
+            ('Deja que te diga cosas al oído', 5.0, 8.0),
+            ('Para que te acuerdes si no estás conmigo', 8.0, 12.0)
+        ]
+    }
+}
+# /api/lyrics response bodies for the samples, serialized once
+_SAMPLE_LYRICS_PAYLOADS = {
+    video_id: json_dumps({
+        'lyrics': sample['lyrics'],
+        'synchronized': [
+            {'text': text, 'startTime': start, 'endTime': end}
+            for text, start, end in sample['synchronized']
+        ],
+        'hasLyrics': True
+    })
+    for video_id, sample in _SAMPLE_LYRICS.items()
+}
+# Strong validators for the sample payloads so clients can revalidate with If-None-Match
+_SAMPLE_LYRICS_ETAGS = {
+    video_id: '"%s"' % hashlib.blake2b(payload, digest_size=8).hexdigest()
+    for video_id, payload in _SAMPLE_LYRICS_PAYLOADS.items()
+}
+SAMPLE_LYRICS_MAX_AGE = 86400  # Seconds clients may reuse sample lyrics without asking
+PUBLIC_CACHE_MAX_AGE = 60  # Seconds clients and proxies may reuse public catalogue responses
+
+def get_ytmusic() -> Optional['YTMusic']:
+    """Return the process-wide YTMusic client, creating it on first use.
+
+    Building a client parses the auth headers and sets up a new HTTP session, so
+    it is done once instead of per request. Returns None when ytmusicapi is not
+    installed or initialization failed; a failed initialization is retried on the
+    next call.
+    """
+    global _YTMUSIC
+    if not YTMUSIC_AVAILABLE or _YTMUSIC is not None:
+        return _YTMUSIC
+    with _YTMUSIC_LOCK:
+        if _YTMUSIC is not None:
+            return _YTMUSIC
+        headers_path = os.path.join(ROOT_DIR, 'headers_auth.json')
+        try:
+            # Allow providing headers via env for headless hosting
+            if YTMUSIC_HEADERS_B64 and not os.path.exists(headers_path):
+                try:
+                    decoded = base64.b64decode(YTMUSIC_HEADERS_B64)
+                    with open(headers_path, 'wb') as f:
+                        f.write(decoded)
+                except Exception as e:
+                    logger.warning("Failed writing YTMusic headers from env: %s", e)
+            if os.path.exists(headers_path):
+                _YTMUSIC = YTMusic(headers_path)
+            else:
+                _YTMUSIC = YTMusic()
+        except Exception as e:
+            logger.error("Error initializing YTMusic: %s", e)
+        return _YTMUSIC
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def get_ytdlp_opts() -> Dict[str, Any]:
+    """Build the yt-dlp options once, writing env-provided cookies to a temp file."""
+    global _YTDLP_OPTS
+    if _YTDLP_OPTS is not None:
+        return _YTDLP_OPTS
+    with _YTDLP_OPTS_LOCK:
+        if _YTDLP_OPTS is not None:
+            return _YTDLP_OPTS
+        # Request best audio; never fallback to best video
+        ydl_opts = {
+            'format': 'bestaudio[acodec!=none]/bestaudio/best',
+            'quiet': True,
+            'nocheckcertificate': True,
+            'noplaylist': True,
+            'ignoreerrors': True,
+            'skip_download': True,
+            'cachedir': False,
+            'http_headers': {
+                'User-Agent': YTDLP_UA,
+                'Accept-Language': YTDLP_LANG,
+                'Referer': 'https://www.youtube.com/'
+            }
+        }
+        # Attach cookies if provided (mitigates 429/age-gate)
+        if YTDLP_COOKIES_PATH and os.path.exists(YTDLP_COOKIES_PATH):
+            ydl_opts['cookiefile'] = YTDLP_COOKIES_PATH
+        elif YTDLP_COOKIES_B64:
             try:
-                # Allow providing headers via env for headless hosting
-                if YTMUSIC_HEADERS_B64 and not os.path.exists(headers_path):
-                    try:
-                        decoded = base64.b64decode(YTMUSIC_HEADERS_B64)
-                        with open(headers_path, 'wb') as f:
-                            f.write(decoded)
-                    except Exception as e:
-                        print(f"Failed writing YTMusic headers from env: {e}")
-                if os.path.exists(headers_path):
-                    self.ytmusic = YTMusic(headers_path)
-                else:
-                    self.ytmusic = YTMusic()
+                decoded = base64.b64decode(YTDLP_COOKIES_B64)
+                fd, temp_cookie_path = tempfile.mkstemp(prefix='yt_cookies_', suffix='.txt')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(decoded)
+                ydl_opts['cookiefile'] = temp_cookie_path
+                atexit.register(_remove_file, temp_cookie_path)
             except Exception as e:
-                print(f"Error initializing YTMusic: {e}")
-                self.ytmusic = None
+                logger.warning("Failed to load cookies from env: %s", e)
+        _YTDLP_OPTS = ydl_opts
+        return _YTDLP_OPTS
+
+def get_ytdlp() -> 'YoutubeDL':
+    """Return this thread's YoutubeDL instance, creating it on first use."""
+    ydl = getattr(_YTDLP_LOCAL, 'ydl', None)
+    if ydl is None:
+        # YoutubeDL replaces keys such as http_headers in the dict it is given
+        ydl = _YTDLP_LOCAL.ydl = YoutubeDL(dict(get_ytdlp_opts()))
+    return ydl
+
+def _audio_format_rank(fmt: Dict[str, Any]) -> Tuple[bool, float]:
+    """Sort key for audio-only formats: m4a/aac before anything else, then bitrate."""
+    acodec = str(fmt.get('acodec', '')).lower()
+    is_m4a = fmt.get('ext') == 'm4a' or 'mp4a' in acodec or 'aac' in acodec
+    return is_m4a, fmt.get('abr') or 0
+
+def _audio_stream_info(fmt: Dict[str, Any]) -> Dict[str, Any]:
+    """The url/abr/acodec/ext fields /api/audio returns for a yt-dlp format."""
+    return {'url': fmt['url'], 'abr': fmt.get('abr'), 'acodec': fmt.get('acodec'), 'ext': fmt.get('ext')}
+
+def extract_audio_stream(video_id: str) -> Tuple[Dict[str, Any], int]:
+    """Pick the best audio-only stream for a videoId using yt-dlp.
+
+    Returns ``(data, status_code)``; on success ``data`` holds url/abr/acodec/ext,
+    otherwise it holds an ``error`` message.
+    """
+    try:
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        info = get_ytdlp().extract_info(url, download=False)
+        if not info:
+            return {'error': 'Failed to extract audio'}, 502
+        # If yt-dlp already selected a format, validate it is audio-only
+        top_vcodec = info.get('vcodec')
+        if info.get('url') and (top_vcodec == 'none' or not top_vcodec) and info.get('acodec'):
+            return _audio_stream_info(info), 200
+        # Otherwise strictly pick formats with no video
+        fmts = info.get('formats') or []
+        audio_only = (f for f in fmts if f and f.get('url') and (f.get('vcodec') == 'none' or not f.get('vcodec')) and f.get('acodec'))
+        # Strongly prefer m4a/aac for Safari/iOS support, then the highest bitrate
+        chosen = max(audio_only, key=_audio_format_rank, default=None)
+        if not chosen:
+            return {'error': 'No audio-only stream found'}, 502
+        return _audio_stream_info(chosen), 200
+    except Exception as e:
+        logger.error("yt-dlp extraction error for %s: %s", video_id, e)
+        return {'error': 'Audio extraction failed'}, 500
+
+def stream_url_ttl(url: str) -> float:
+    """Seconds a googlevideo URL stays usable, from its expire= query param."""
+    expire = get_query_param(urllib.parse.urlsplit(url).query, 'expire')
+    try:
+        return int(expire) - time.time() - AUDIO_EXPIRE_MARGIN
+    except ValueError:
+        return AUDIO_CACHE_TTL
+
+def resolve_audio_stream(video_id: str) -> Tuple[Dict[str, Any], int]:
+    """Run extract_audio_stream once per videoId, however many requests ask for it.
+
+    Concurrent callers for the same videoId wait on the first caller's result
+    instead of starting their own extraction. Successful results are cached, and
+    failures are remembered for AUDIO_FAILURE_TTL seconds.
+    """
+    failure = _AUDIO_FAILURES.get(video_id)
+    if failure:
+        return failure
+    with _AUDIO_INFLIGHT_LOCK:
+        future = _AUDIO_INFLIGHT.get(video_id)
+        is_leader = future is None
+        if is_leader:
+            future = _AUDIO_INFLIGHT[video_id] = Future()
+    if not is_leader:
+        return future.result(timeout=AUDIO_INFLIGHT_TIMEOUT)
+    try:
+        data, status_code = extract_audio_stream(video_id)
+        if status_code == 200:
+            ttl = stream_url_ttl(data['url'])
+            if ttl > 0:
+                _AUDIO_CACHE.set(video_id, data, ttl)
         else:
-            self.ytmusic = None
-            
+            _AUDIO_FAILURES.set(video_id, (data, status_code))
+        future.set_result((data, status_code))
+        return data, status_code
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _AUDIO_INFLIGHT_LOCK:
+            _AUDIO_INFLIGHT.pop(video_id, None)
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+class PooledTCPServer(ThreadingTCPServer):
+    """ThreadingTCPServer that serves connections on a bounded thread pool.
+
+    ThreadingTCPServer starts a new thread for every connection; here connections
+    are handed to a fixed set of worker threads and queue up when all are busy.
+    """
+
+    # Rebind right after a restart instead of failing while old sockets sit in TIME_WAIT
+    allow_reuse_address = True
+    allow_reuse_port = SERVER_REUSE_PORT
+    # listen() backlog; the socketserver default of 5 drops connection bursts
+    request_queue_size = 128
+
+    def __init__(self, *args, max_workers: int = SERVER_MAX_WORKERS, **kwargs):
+        # Set up before binding: TCPServer.__init__ calls server_close if bind fails
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http-worker')
+        # Open client sockets, so server_close can wake workers blocked on them
+        self._requests = set()
+        self._requests_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def process_request(self, request, client_address):
+        with self._requests_lock:
+            self._requests.add(request)
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def shutdown_request(self, request):
+        with self._requests_lock:
+            self._requests.discard(request)
+        super().shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Pool workers are joined at interpreter exit, so end their connections
+        # instead of letting idle clients keep the process alive
+        with self._requests_lock:
+            requests = list(self._requests)
+        for request in requests:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+# Sent on every API response and on CORS preflights
+_CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+)
+# Sent on successful catalogue responses that are the same for every user;
+# never on /api/user/* or locally stored playlists
+_PUBLIC_CACHE_HEADERS = (('Cache-Control', f'public, max-age={PUBLIC_CACHE_MAX_AGE}'),)
+
+class YTMusicRequestHandler(SimpleHTTPRequestHandler):
+    # Socket read timeout, so idle clients cannot hold pool workers forever
+    timeout = REQUEST_TIMEOUT
+    # Send small JSON responses immediately instead of waiting on Nagle's algorithm
+    disable_nagle_algorithm = True
+    # Buffer writes so the header block and body go out together; the server
+    # flushes wfile after every request
+    wbufsize = 64 * 1024
+    # Exact-path API routes mapped to handler method names. GET handlers take the
+    # raw query string; /api/playlist/<id> is matched by prefix in do_GET.
+    GET_ROUTES = {
+        '/api/search': 'handle_api_search',
+        '/api/trending': 'handle_api_trending',
+        '/api/search_multi': 'handle_api_search_multi',
+        '/api/album': 'handle_api_album',
+        '/api/artist': 'handle_api_artist',
+        '/api/recommendations': 'handle_api_recommendations',
+        '/api/user/liked': 'handle_api_user_liked',
+        '/api/user/playlists': 'handle_api_user_playlists',
+        '/api/lyrics': 'handle_api_lyrics',
+        '/api/audio': 'handle_api_audio',
+    }
+    POST_ROUTES = {
+        '/api/user/like': 'handle_api_user_like',
+        '/api/user/unlike': 'handle_api_user_unlike',
+        '/api/playlist/create': 'handle_api_playlist_create',
+        '/api/playlist/add-song': 'handle_api_playlist_add_song',
+        '/api/playlist/add-songs': 'handle_api_playlist_add_songs',
+        '/api/playlist/remove-song': 'handle_api_playlist_remove_song',
+    }
+
+    def __init__(self, *args, **kwargs):
+        # YouTube Music API client shared by all requests
+        self.ytmusic = get_ytmusic()
         super().__init__(*args, directory=ROOT_DIR, **kwargs)
 
+    def handle(self) -> None:
+        """Serve the connection, ignoring clients that disconnect mid-response"""
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # With buffered writes this surfaces at the per-request flush rather
+            # than in send_json_bytes
+            pass
+
+    def finish(self) -> None:
+        try:
+            super().finish()
+        except (BrokenPipeError, ConnectionResetError):
+            # Closing wfile flushes the undelivered response again
+            self.rfile.close()
+
     def do_GET(self):  # noqa: N802 (keep stdlib naming)
         parsed = urllib.parse.urlsplit(self.path)
         path = parsed.path
         
         # API routes
-        if path == '/api/search':
-            self.handle_api_search(parsed.query)
-            return
-        elif path == '/api/trending':
-            self.handle_api_trending()
-            return
-        elif path == '/api/search_multi':
-            self.handle_api_search_multi(parsed.query)
-            return
-        elif path == '/api/album':
-            self.handle_api_album(parsed.query)
-            return
-        elif path == '/api/artist':
-            self.handle_api_artist(parsed.query)
+        handler_name = self.GET_ROUTES.get(path)
+        if handler_name:
+            getattr(self, handler_name)(parsed.query)
             return
-        elif path == '/api/recommendations':
-            self.handle_api_recommendations(parsed.query)
-            return
-        elif path == '/api/user/liked':
-            self.handle_api_user_liked(parsed.query)
-            return
-        elif path == '/api/user/playlists':
-            self.handle_api_user_playlists(parsed.query)
-            return
-        elif path.startswith('/api/playlist/'):
+        if path.startswith('/api/playlist/'):
             playlist_id = path.split('/')[-1]
             self.handle_api_playlist(playlist_id)
             return
-        elif path == '/api/lyrics':
-            self.handle_api_lyrics(parsed.query)
-            return
-        elif path == '/api/audio':
-            self.handle_api_audio(parsed.query)
-            return
         
         # Serve static files
         if path == '/':
@@ -274,149 +908,162 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
         path = parsed.path
         
         # Handle POST requests for user data
-        if path == '/api/user/like':
-            self.handle_api_user_like()
-        elif path == '/api/user/unlike':
-            self.handle_api_user_unlike()
-        elif path == '/api/playlist/create':
-            self.handle_api_playlist_create()
-        elif path == '/api/playlist/add-song':
-            self.handle_api_playlist_add_song()
-        elif path == '/api/playlist/remove-song':
-            self.handle_api_playlist_remove_song()
+        handler_name = self.POST_ROUTES.get(path)
+        if handler_name:
+            getattr(self, handler_name)()
         else:
             self.send_error(404, "Not Found")
 
     def handle_api_search(self, query_string: str) -> None:
         """Handle music search requests"""
-        params = urllib.parse.parse_qs(query_string or '')
-        q_list = params.get('q', [''])
-        q = (q_list[0] if q_list else '').strip()
+        qs = query_string or ''
+        q = get_query_param(qs, 'q').strip()
         
         results: List[Dict[str, Any]] = []
         
+        cached = _SEARCH_CACHE.get(q) if q else None
+        if cached is not None:
+            self.send_json_response({'results': cached}, headers=_PUBLIC_CACHE_HEADERS)
+            return
+        
+        demo = False
         if q:
             if self.ytmusic:
                 try:
+                    # Keyed by videoId so duplicates and entries without an id drop out in one pass
+                    found: Dict[str, Dict[str, Any]] = {}
                     # Search for songs
                     songs = self.ytmusic.search(q, filter='songs', limit=15)
-                    results.extend(map(map_song_result, songs))
+                    for r in map(map_song_result, songs):
+                        if r['videoId']:
+                            found.setdefault(r['videoId'], r)
                     
                     # If not enough results, search videos too
-                    if len(results) < 10:
+                    if len(found) < 10:
                         videos = self.ytmusic.search(q, filter='videos', limit=15)
-                        video_results = map(map_song_result, videos)
-                        # Filter out duplicates
-                        existing_ids = {r.get('videoId') for r in results}
-                        results.extend([r for r in video_results if r.get('videoId') not in existing_ids])
+                        for r in map(map_song_result, videos):
+                            if len(found) >= 20:
+                                break
+                            if r['videoId']:
+                                found.setdefault(r['videoId'], r)
+                    results = list(found.values())
                         
                 except Exception as e:
-                    print(f"Search error: {e}")
+                    logger.error("Search error: %s", e)
                     # Fallback to hosted backend
-                    remote = fetch_remote_json('/api/search?' + (query_string or ''))
+                    remote = fetch_remote_json('/api/search?' + qs)
                     if remote and isinstance(remote.get('results'), list):
                         results = [r for r in remote['results'] if r.get('videoId')]
                     else:
                         results = get_demo_results(q)
+                        demo = True
             else:
                 # No local API; try hosted backend
-                remote = fetch_remote_json('/api/search?' + (query_string or ''))
+                remote = fetch_remote_json('/api/search?' + qs)
                 if remote and isinstance(remote.get('results'), list):
                     results = [r for r in remote['results'] if r.get('videoId')]
                 else:
                     results = get_demo_results(q)
+                    demo = True
         
-        # Filter out results without video IDs
-        results = [r for r in results if r.get('videoId')][:20]
+        results = results[:20]
+        if q and not demo:
+            _SEARCH_CACHE.set(q, results)
+            self.send_json_response({'results': results}, headers=_PUBLIC_CACHE_HEADERS)
+            return
         
         self.send_json_response({'results': results})
 
     def handle_api_search_multi(self, query_string: str) -> None:
         """Return songs, albums, artists, playlists, and podcasts for a query"""
-        params = urllib.parse.parse_qs(query_string or '')
-        q_list = params.get('q', [''])
-        q = (q_list[0] if q_list else '').strip()
+        q = get_query_param(query_string or '', 'q').strip()
         out = {'songs': [], 'albums': [], 'artists': [], 'playlists': [], 'podcasts': []}
         if not q:
             self.send_json_response(out)
             return
+        headers: Tuple[Tuple[str, str], ...] = ()
         if self.ytmusic:
+            # The five searches are independent round-trips, so run them concurrently
+            futures = {
+                search_filter: _SEARCH_POOL.submit(self.ytmusic.search, q, filter=search_filter, limit=15)
+                for search_filter in SEARCH_MULTI_FILTERS
+            }
+            # One deadline for the whole fan-out rather than one per filter
+            done, pending = wait(futures.values(), timeout=SEARCH_MULTI_TIMEOUT)
+            if not pending and all(f.exception() is None for f in done):
+                headers = _PUBLIC_CACHE_HEADERS
             try:
                 # Search for songs
-                songs = self.ytmusic.search(q, filter='songs', limit=15)
+                songs = self._search_results(futures, 'songs')
                 out['songs'] = [map_song_result(s) for s in songs if s]
                 
                 # Search for albums
-                albums = self.ytmusic.search(q, filter='albums', limit=15)
+                albums = self._search_results(futures, 'albums')
                 out['albums'] = [
                     {
                         'albumId': a.get('browseId') or a.get('playlistId') or a.get('videoId'),
                         'title': a.get('title') or a.get('name'),
-                        'artist': ', '.join([ar.get('name') for ar in (a.get('artists') or []) if ar.get('name')]) if a.get('artists') else None,
-                        'thumbnail': (a.get('thumbnails') or [{}])[-1].get('url') if a.get('thumbnails') else None
+                        'artist': _join_artist_names(a['artists']) if a.get('artists') else None,
+                        'thumbnail': _last_thumbnail_url(a)
                     }
                     for a in albums if a
                 ]
                 
                 # Search for artists
-                artists = self.ytmusic.search(q, filter='artists', limit=15)
+                artists = self._search_results(futures, 'artists')
                 out['artists'] = [
                     {
                         'artistId': ar.get('browseId') or ar.get('channelId'),
                         'name': ar.get('artist') or ar.get('title') or ar.get('name'),
-                        'thumbnail': (ar.get('thumbnails') or [{}])[-1].get('url') if ar.get('thumbnails') else None
+                        'thumbnail': _last_thumbnail_url(ar)
                     }
                     for ar in artists if ar
                 ]
                 
                 # Search for playlists
-                playlists = self.ytmusic.search(q, filter='playlists', limit=15)
+                playlists = self._search_results(futures, 'playlists')
                 out['playlists'] = [
                     {
                         'playlistId': p.get('browseId') or p.get('playlistId'),
                         'title': p.get('title') or p.get('name'),
                         'author': p.get('author') or p.get('artist'),
-                        'thumbnail': (p.get('thumbnails') or [{}])[-1].get('url') if p.get('thumbnails') else None,
+                        'thumbnail': _last_thumbnail_url(p),
                         'songCount': p.get('songCount') or p.get('itemCount')
                     }
                     for p in playlists if p
                 ]
                 
                 # Search for podcasts (using community playlists as a proxy)
-                try:
-                    podcasts = self.ytmusic.search(q, filter='community_playlists', limit=15)
-                    out['podcasts'] = [
-                        {
-                            'podcastId': p.get('browseId') or p.get('playlistId'),
-                            'title': p.get('title') or p.get('name'),
-                            'author': p.get('author') or p.get('artist'),
-                            'thumbnail': (p.get('thumbnails') or [{}])[-1].get('url') if p.get('thumbnails') else None,
-                            'episodeCount': p.get('songCount') or p.get('itemCount')
-                        }
-                        for p in podcasts if p and (
-                            'podcast' in (p.get('title', '') + p.get('name', '')).lower() or
-                            'episode' in (p.get('title', '') + p.get('name', '')).lower() or
-                            'show' in (p.get('title', '') + p.get('name', '')).lower() or
-                            'radio' in (p.get('title', '') + p.get('name', '')).lower()
-                        )
-                    ]
-                except Exception as e:
-                    print(f"Podcast search error: {e}")
-                    out['podcasts'] = []
+                podcasts = self._search_results(futures, 'community_playlists')
+                out['podcasts'] = [
+                    {
+                        'podcastId': p.get('browseId') or p.get('playlistId'),
+                        'title': p.get('title') or p.get('name'),
+                        'author': p.get('author') or p.get('artist'),
+                        'thumbnail': _last_thumbnail_url(p),
+                        'episodeCount': p.get('songCount') or p.get('itemCount')
+                    }
+                    for p in podcasts
+                    if p and _PODCAST_RE.search((p.get('title') or '') + ' ' + (p.get('name') or ''))
+                ]
                     
             except Exception as e:
-                print(f"search_multi error: {e}")
+                logger.error("search_multi error: %s", e)
                 out = self._demo_search_multi(q)
+                headers = ()
         else:
             out = self._demo_search_multi(q)
-        self.send_json_response(out)
+        self.send_json_response(out, headers=headers)
 
     def handle_api_album(self, query_string: str) -> None:
-        params = urllib.parse.parse_qs(query_string or '')
-        album_id = (params.get('id', [''])[0] or '').strip()
+        album_id = get_query_param(query_string or '', 'id').strip()
         if not album_id:
             self.send_json_response({'error': 'Album id required'}, 400)
             return
+        cached = _YTM_CACHE.get(('album', album_id))
+        if cached is not None:
+            self.send_json_response({'album': cached}, headers=_PUBLIC_CACHE_HEADERS)
+            return
         if self.ytmusic:
             try:
                 album = self.ytmusic.get_album(album_id)
@@ -425,14 +1072,15 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 data = {
                     'albumId': album_id,
                     'title': album.get('title'),
-                    'artist': (album.get('artists') or [{}])[0].get('name') if album.get('artists') else None,
-                    'thumbnail': ((album.get('thumbnails') or [{}])[-1]).get('url') if album.get('thumbnails') else None,
+                    'artist': album['artists'][0].get('name') if album.get('artists') else None,
+                    'thumbnail': _last_thumbnail_url(album),
                     'songs': songs
                 }
-                self.send_json_response({'album': data})
+                _YTM_CACHE.set(('album', album_id), data)
+                self.send_json_response({'album': data}, headers=_PUBLIC_CACHE_HEADERS)
                 return
             except Exception as e:
-                print(f"album error: {e}")
+                logger.error("album error: %s", e)
         # Empty album response when API is unavailable
         self.send_json_response({'album': {
             'albumId': album_id,
@@ -443,11 +1091,14 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
         }})
 
     def handle_api_artist(self, query_string: str) -> None:
-        params = urllib.parse.parse_qs(query_string or '')
-        artist_id = (params.get('id', [''])[0] or '').strip()
+        artist_id = get_query_param(query_string or '', 'id').strip()
         if not artist_id:
             self.send_json_response({'error': 'Artist id required'}, 400)
             return
+        cached = _YTM_CACHE.get(('artist', artist_id))
+        if cached is not None:
+            self.send_json_response({'artist': cached}, headers=_PUBLIC_CACHE_HEADERS)
+            return
         if self.ytmusic:
             try:
                 artist = self.ytmusic.get_artist(artist_id)
@@ -457,13 +1108,14 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 data = {
                     'artistId': artist_id,
                     'name': artist.get('name'),
-                    'thumbnail': ((artist.get('thumbnails') or [{}])[-1]).get('url') if artist.get('thumbnails') else None,
+                    'thumbnail': _last_thumbnail_url(artist),
                     'songs': songs or get_demo_results('artist')
                 }
-                self.send_json_response({'artist': data})
+                _YTM_CACHE.set(('artist', artist_id), data)
+                self.send_json_response({'artist': data}, headers=_PUBLIC_CACHE_HEADERS)
                 return
             except Exception as e:
-                print(f"artist error: {e}")
+                logger.error("artist error: %s", e)
         self.send_json_response({'artist': {
             'artistId': artist_id,
             'name': 'Artist Unavailable',
@@ -471,6 +1123,20 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
             'songs': []
         }})
 
+    def _search_results(self, futures: Dict[str, Future], search_filter: str) -> List[Dict[str, Any]]:
+        """Result of one search_multi query; a failed or unfinished filter yields no results"""
+        future = futures[search_filter]
+        if not future.done():
+            # Drops the query if it has not started yet; a running one is left to finish
+            future.cancel()
+            logger.error("search_multi %s error: timed out", search_filter)
+            return []
+        try:
+            return future.result() or []
+        except Exception as e:
+            logger.error("search_multi %s error: %s", search_filter, e)
+            return []
+
     def _demo_search_multi(self, q: str) -> Dict[str, Any]:
         # Return empty results for demo mode
         return {
@@ -481,8 +1147,12 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
             'podcasts': []
         }
 
-    def handle_api_trending(self) -> None:
+    def handle_api_trending(self, query_string: str = '') -> None:
         """Handle trending music requests"""
+        cached = _TRENDING_CACHE.get('charts')
+        if cached is not None:
+            self.send_json_response({'results': cached}, headers=_PUBLIC_CACHE_HEADERS)
+            return
         results: List[Dict[str, Any]] = []
         if self.ytmusic:
             try:
@@ -490,19 +1160,22 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 if trending and 'songs' in trending:
                     results = [map_song_result(song) for song in trending['songs'][:20]]
             except Exception as e:
-                print(f"Trending error: {e}")
+                logger.error("Trending error: %s", e)
         # If empty, try hosted backend
         if not results:
             remote = fetch_remote_json('/api/trending')
             if remote and isinstance(remote.get('results'), list):
                 results = [r for r in remote['results'] if r.get('videoId')]
+        if results:
+            _TRENDING_CACHE.set('charts', results)
+            self.send_json_response({'results': results}, headers=_PUBLIC_CACHE_HEADERS)
+            return
         
         self.send_json_response({'results': results})
 
     def handle_api_recommendations(self, query_string: str) -> None:
         """Handle music recommendations based on a song"""
-        params = urllib.parse.parse_qs(query_string or '')
-        video_id = params.get('videoId', [''])[0]
+        video_id = get_query_param(query_string or '', 'videoId')
         
         results = []
         if video_id and self.ytmusic:
@@ -513,126 +1186,96 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 if 'tracks' in watch_playlist:
                     results = [map_song_result(track) for track in watch_playlist['tracks']]
             except Exception as e:
-                print(f"Recommendations error: {e}")
+                logger.error("Recommendations error: %s", e)
                 results = []
         else:
             results = []
         
-        self.send_json_response({'results': results})
+        self.send_json_response({'results': results}, headers=_PUBLIC_CACHE_HEADERS if results else ())
 
     def handle_api_user_liked(self, query_string: str) -> None:
         """Handle user's liked songs"""
-        params = urllib.parse.parse_qs(query_string or '')
-        user_id = params.get('userId', [''])[0]
+        user_id = get_query_param(query_string or '', 'userId')
         
         if not user_id:
             self.send_json_response({'error': 'User ID required'}, 400)
             return
         
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT video_id, title, artist, thumbnail, duration 
-                FROM liked_songs 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC
-            ''', (user_id,))
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'videoId': row[0],
-                    'title': row[1],
-                    'artist': row[2],
-                    'thumbnail': row[3],
-                    'duration': row[4]
-                })
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT video_id, title, artist, thumbnail, duration 
+                    FROM liked_songs 
+                    WHERE user_id = ? 
+                    ORDER BY created_at DESC
+                ''', (user_id,))
+                
+                results = [dict(zip(_LIKED_SONG_KEYS, row)) for row in cursor]
             
-            conn.close()
             self.send_json_response({'results': results})
             
         except Exception as e:
-            print(f"Error fetching liked songs: {e}")
+            logger.error("Error fetching liked songs: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_user_playlists(self, query_string: str) -> None:
         """Handle user's playlists"""
-        params = urllib.parse.parse_qs(query_string or '')
-        user_id = params.get('userId', [''])[0]
+        user_id = get_query_param(query_string or '', 'userId')
         
         if not user_id:
             self.send_json_response({'error': 'User ID required'}, 400)
             return
         
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT p.id, p.name, p.description, p.created_at,
-                       COUNT(ps.id) as song_count
-                FROM playlists p
-                LEFT JOIN playlist_songs ps ON p.id = ps.playlist_id
-                WHERE p.user_id = ?
-                GROUP BY p.id, p.name, p.description, p.created_at
-                ORDER BY p.created_at DESC
-            ''', (user_id,))
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'description': row[2],
-                    'createdAt': row[3],
-                    'songCount': row[4]
-                })
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT p.id, p.name, p.description, p.created_at,
+                           (SELECT COUNT(*) FROM playlist_songs ps
+                            WHERE ps.playlist_id = p.id) as song_count
+                    FROM playlists p
+                    WHERE p.user_id = ?
+                    ORDER BY p.created_at DESC
+                ''', (user_id,))
+                
+                results = [dict(zip(_USER_PLAYLIST_KEYS, row)) for row in cursor]
             
-            conn.close()
             self.send_json_response({'results': results})
             
         except Exception as e:
-            print(f"Error fetching playlists: {e}")
+            logger.error("Error fetching playlists: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_playlist(self, playlist_id: str) -> None:
         """Handle individual playlist data"""
         try:
             # First try to get from local database
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            # Get playlist info
-            cursor.execute('''
-                SELECT p.name, p.description, p.created_at
-                FROM playlists p
-                WHERE p.id = ?
-            ''', (playlist_id,))
-            
-            playlist_row = cursor.fetchone()
-            if playlist_row:
-                # Found in local database
-                # Get playlist songs
+            with get_db() as conn:
+                cursor = conn.cursor()
+                
+                # Get playlist info
                 cursor.execute('''
-                    SELECT video_id, title, artist, thumbnail, duration, position
-                    FROM playlist_songs
-                    WHERE playlist_id = ?
-                    ORDER BY position ASC
+                    SELECT p.name, p.description, p.created_at
+                    FROM playlists p
+                    WHERE p.id = ?
                 ''', (playlist_id,))
                 
+                playlist_row = cursor.fetchone()
                 songs = []
-                for row in cursor.fetchall():
-                    songs.append({
-                        'videoId': row[0],
-                        'title': row[1],
-                        'artist': row[2],
-                        'thumbnail': row[3],
-                        'duration': row[4],
-                        'position': row[5]
-                    })
-                
-                conn.close()
-                
+                if playlist_row:
+                    # Get playlist songs
+                    cursor.execute('''
+                        SELECT video_id, title, artist, thumbnail, duration, position
+                        FROM playlist_songs
+                        WHERE playlist_id = ?
+                        ORDER BY position ASC
+                    ''', (playlist_id,))
+                    
+                    songs = [dict(zip(_PLAYLIST_SONG_KEYS, row)) for row in cursor]
+            
+            if playlist_row:
+                # Found in local database
                 playlist_data = {
                     'id': playlist_id,
                     'name': playlist_row[0],
@@ -644,12 +1287,14 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 self.send_json_response({'playlist': playlist_data})
                 return
             
-            conn.close()
-            
             # Not found in local database, try YouTube Music API
+            cached = _YTM_CACHE.get(('playlist', playlist_id))
+            if cached is not None:
+                self.send_json_response({'playlist': cached}, headers=_PUBLIC_CACHE_HEADERS)
+                return
             if self.ytmusic:
                 try:
-                    print(f"Fetching YouTube Music playlist: {playlist_id}")
+                    logger.debug("Fetching YouTube Music playlist: %s", playlist_id)
                     playlist_data = self.ytmusic.get_playlist(playlist_id)
                     
                     if playlist_data:
@@ -662,8 +1307,8 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                                 songs.append({
                                     'videoId': track.get('videoId'),
                                     'title': track.get('title', 'Unknown Title'),
-                                    'artist': ', '.join([a.get('name', '') for a in track.get('artists', []) if a.get('name')]) or 'Unknown Artist',
-                                    'thumbnail': (track.get('thumbnails') or [{}])[-1].get('url') if track.get('thumbnails') else None,
+                                    'artist': _join_artist_names(track.get('artists') or []) or 'Unknown Artist',
+                                    'thumbnail': _last_thumbnail_url(track),
                                     'duration': track.get('duration'),
                                     'position': len(songs)
                                 })
@@ -675,26 +1320,25 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                             'createdAt': None,
                             'songs': songs
                         }
+                        _YTM_CACHE.set(('playlist', playlist_id), playlist_info)
                         
-                        self.send_json_response({'playlist': playlist_info})
+                        self.send_json_response({'playlist': playlist_info}, headers=_PUBLIC_CACHE_HEADERS)
                         return
                         
                 except Exception as e:
-                    print(f"Error fetching YouTube Music playlist: {e}")
+                    logger.error("Error fetching YouTube Music playlist: %s", e)
             
             # Not found anywhere
             self.send_json_response({'error': 'Playlist not found'}, 404)
             
         except Exception as e:
-            print(f"Error fetching playlist: {e}")
+            logger.error("Error fetching playlist: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_user_like(self) -> None:
         """Handle liking a song"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = self.read_json_body()
             
             user_id = data.get('userId')
             song = data.get('song', {})
@@ -703,30 +1347,27 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 self.send_json_response({'error': 'Invalid data'}, 400)
                 return
             
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR IGNORE INTO liked_songs 
-                (user_id, video_id, title, artist, thumbnail, duration)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (user_id, song['videoId'], song['title'], 
-                  song.get('artist'), song.get('thumbnail'), song.get('duration')))
-            
-            conn.commit()
-            conn.close()
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT OR IGNORE INTO liked_songs 
+                    (user_id, video_id, title, artist, thumbnail, duration)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (user_id, song['videoId'], song['title'], 
+                      song.get('artist'), song.get('thumbnail'), song.get('duration')))
+                
+                conn.commit()
             
             self.send_json_response({'success': True})
             
         except Exception as e:
-            print(f"Error liking song: {e}")
+            logger.error("Error liking song: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_user_unlike(self) -> None:
         """Handle unliking a song"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = self.read_json_body()
             
             user_id = data.get('userId')
             video_id = data.get('videoId')
@@ -735,28 +1376,25 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 self.send_json_response({'error': 'Invalid data'}, 400)
                 return
             
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM liked_songs 
-                WHERE user_id = ? AND video_id = ?
-            ''', (user_id, video_id))
-            
-            conn.commit()
-            conn.close()
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    DELETE FROM liked_songs 
+                    WHERE user_id = ? AND video_id = ?
+                ''', (user_id, video_id))
+                
+                conn.commit()
             
             self.send_json_response({'success': True})
             
         except Exception as e:
-            print(f"Error unliking song: {e}")
+            logger.error("Error unliking song: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_playlist_create(self) -> None:
         """Handle creating a new playlist"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = self.read_json_body()
             
             user_id = data.get('userId')
             name = data.get('name')
@@ -767,28 +1405,25 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 self.send_json_response({'error': 'Invalid data'}, 400)
                 return
             
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO playlists (id, user_id, name, description)
-                VALUES (?, ?, ?, ?)
-            ''', (playlist_id, user_id, name, description))
-            
-            conn.commit()
-            conn.close()
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO playlists (id, user_id, name, description)
+                    VALUES (?, ?, ?, ?)
+                ''', (playlist_id, user_id, name, description))
+                
+                conn.commit()
             
             self.send_json_response({'success': True, 'playlistId': playlist_id})
             
         except Exception as e:
-            print(f"Error creating playlist: {e}")
+            logger.error("Error creating playlist: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_playlist_add_song(self) -> None:
         """Handle adding a song to a playlist"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = self.read_json_body()
             
             playlist_id = data.get('playlistId')
             song = data.get('song', {})
@@ -797,41 +1432,43 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 self.send_json_response({'error': 'Invalid data'}, 400)
                 return
             
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
+            with get_db() as conn:
+                add_playlist_songs(conn, playlist_id, [song])
             
-            # Get next position
-            cursor.execute('''
-                SELECT COALESCE(MAX(position), 0) + 1 
-                FROM playlist_songs 
-                WHERE playlist_id = ?
-            ''', (playlist_id,))
-            next_position = cursor.fetchone()[0]
+            self.send_json_response({'success': True})
             
-            # Add song to playlist
-            cursor.execute('''
-                INSERT INTO playlist_songs 
-                (playlist_id, video_id, title, artist, thumbnail, duration, position)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (playlist_id, song['videoId'], song['title'], 
-                  song.get('artist'), song.get('thumbnail'), 
-                  song.get('duration'), next_position))
+        except Exception as e:
+            logger.error("Error adding song to playlist: %s", e)
+            self.send_json_response({'error': 'Internal server error'}, 500)
+
+    def handle_api_playlist_add_songs(self) -> None:
+        """Handle adding several songs to a playlist in one transaction"""
+        try:
+            data = self.read_json_body()
             
-            conn.commit()
-            conn.close()
+            playlist_id = data.get('playlistId')
+            songs = data.get('songs')
             
-            self.send_json_response({'success': True})
+            if (not playlist_id or not isinstance(songs, list) or not songs
+                    or len(songs) > PLAYLIST_BATCH_MAX
+                    or not all(isinstance(song, dict) and song.get('videoId')
+                               and isinstance(song.get('title'), str) for song in songs)):
+                self.send_json_response({'error': 'Invalid data'}, 400)
+                return
+            
+            with get_db() as conn:
+                add_playlist_songs(conn, playlist_id, songs)
+            
+            self.send_json_response({'success': True, 'added': len(songs)})
             
         except Exception as e:
-            print(f"Error adding song to playlist: {e}")
+            logger.error("Error adding songs to playlist: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_playlist_remove_song(self) -> None:
         """Handle removing a song from a playlist"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = self.read_json_body()
             
             playlist_id = data.get('playlistId')
             video_id = data.get('videoId')
@@ -840,282 +1477,130 @@ class YTMusicRequestHandler(SimpleHTTPRequestHandler):
                 self.send_json_response({'error': 'Invalid data'}, 400)
                 return
             
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM playlist_songs 
-                WHERE playlist_id = ? AND video_id = ?
-            ''', (playlist_id, video_id))
-            
-            conn.commit()
-            conn.close()
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    DELETE FROM playlist_songs 
+                    WHERE playlist_id = ? AND video_id = ?
+                ''', (playlist_id, video_id))
+                
+                conn.commit()
             
             self.send_json_response({'success': True})
             
         except Exception as e:
-            print(f"Error removing song from playlist: {e}")
+            logger.error("Error removing song from playlist: %s", e)
             self.send_json_response({'error': 'Internal server error'}, 500)
 
     def handle_api_lyrics(self, query_string: str) -> None:
         """Handle lyrics requests for songs"""
-        params = urllib.parse.parse_qs(query_string or '')
-        video_id = params.get('videoId', [''])[0]
+        video_id = get_query_param(query_string or '', 'videoId')
         
         if not video_id:
             self.send_json_response({'error': 'Video ID required'}, 400)
             return
-        
-        # For now, let's provide sample lyrics for testing
-        # In a real implementation, you would integrate with a lyrics API
-        sample_lyrics = {
-            'dQw4w9WgXcQ': {
-                'lyrics': '''Never gonna give you up
-Never gonna let you down
-Never gonna run around and desert you
-Never gonna make you cry
-Never gonna say goodbye
-Never gonna tell a lie and hurt you
-
-We've known each other for so long
-Your heart's been aching but you're too shy to say it
-Inside we both know what's been going on
-We know the game and we're gonna play it
-
-And if you ask me how I'm feeling
-Don't tell me you're too blind to see
-
-Never gonna give you up
-Never gonna let you down
-Never gonna run around and desert you
-Never gonna make you cry
-Never gonna say goodbye
-Never gonna tell a lie and hurt you
-
-We've known each other for so long
-Your heart's been aching but you're too shy to say it
-Inside we both know what's been going on
-We know the game and we're gonna play it
-
-And if you ask me how I'm feeling
-Don't tell me you're too blind to see
-
-Never gonna give you up
-Never gonna let you down
-Never gonna run around and desert you
-Never gonna make you cry
-Never gonna say goodbye
-Never gonna tell a lie and hurt you''',
-                'synchronized': [
-                    {'text': 'Never gonna give you up', 'startTime': 0.0, 'endTime': 3.0},
-                    {'text': 'Never gonna let you down', 'startTime': 3.0, 'endTime': 6.0},
-                    {'text': 'Never gonna run around and desert you', 'startTime': 6.0, 'endTime': 10.0},
-                    {'text': 'Never gonna make you cry', 'startTime': 10.0, 'endTime': 13.0},
-                    {'text': 'Never gonna say goodbye', 'startTime': 13.0, 'endTime': 16.0},
-                    {'text': 'Never gonna tell a lie and hurt you', 'startTime': 16.0, 'endTime': 20.0},
-                    {'text': '', 'startTime': 20.0, 'endTime': 22.0},  # Pause
-                    {'text': 'We\'ve known each other for so long', 'startTime': 22.0, 'endTime': 26.0},
-                    {'text': 'Your heart\'s been aching but you\'re too shy to say it', 'startTime': 26.0, 'endTime': 32.0},
-                    {'text': 'Inside we both know what\'s been going on', 'startTime': 32.0, 'endTime': 36.0},
-                    {'text': 'We know the game and we\'re gonna play it', 'startTime': 36.0, 'endTime': 40.0},
-                    {'text': '', 'startTime': 40.0, 'endTime': 42.0},  # Pause
-                    {'text': 'And if you ask me how I\'m feeling', 'startTime': 42.0, 'endTime': 46.0},
-                    {'text': 'Don\'t tell me you\'re too blind to see', 'startTime': 46.0, 'endTime': 50.0},
-                    {'text': '', 'startTime': 50.0, 'endTime': 52.0},  # Pause
-                    {'text': 'Never gonna give you up', 'startTime': 52.0, 'endTime': 55.0},
-                    {'text': 'Never gonna let you down', 'startTime': 55.0, 'endTime': 58.0},
-                    {'text': 'Never gonna run around and desert you', 'startTime': 58.0, 'endTime': 62.0},
-                    {'text': 'Never gonna make you cry', 'startTime': 62.0, 'endTime': 65.0},
-                    {'text': 'Never gonna say goodbye', 'startTime': 65.0, 'endTime': 68.0},
-                    {'text': 'Never gonna tell a lie and hurt you', 'startTime': 68.0, 'endTime': 72.0},
-                    {'text': '', 'startTime': 72.0, 'endTime': 74.0},  # Pause
-                    {'text': 'We\'ve known each other for so long', 'startTime': 74.0, 'endTime': 78.0},
-                    {'text': 'Your heart\'s been aching but you\'re too shy to say it', 'startTime': 78.0, 'endTime': 84.0},
-                    {'text': 'Inside we both know what\'s been going on', 'startTime': 84.0, 'endTime': 88.0},
-                    {'text': 'We know the game and we\'re gonna play it', 'startTime': 88.0, 'endTime': 92.0},
-                    {'text': '', 'startTime': 92.0, 'endTime': 94.0},  # Pause
-                    {'text': 'And if you ask me how I\'m feeling', 'startTime': 94.0, 'endTime': 98.0},
-                    {'text': 'Don\'t tell me you\'re too blind to see', 'startTime': 98.0, 'endTime': 102.0},
-                    {'text': '', 'startTime': 102.0, 'endTime': 104.0},  # Pause
-                    {'text': 'Never gonna give you up', 'startTime': 104.0, 'endTime': 107.0},
-                    {'text': 'Never gonna let you down', 'startTime': 107.0, 'endTime': 110.0},
-                    {'text': 'Never gonna run around and desert you', 'startTime': 110.0, 'endTime': 114.0},
-                    {'text': 'Never gonna make you cry', 'startTime': 114.0, 'endTime': 117.0},
-                    {'text': 'Never gonna say goodbye', 'startTime': 117.0, 'endTime': 120.0},
-                    {'text': 'Never gonna tell a lie and hurt you', 'startTime': 120.0, 'endTime': 124.0},
-                    {'text': '', 'startTime': 124.0, 'endTime': 130.0},  # Instrumental break
-                    {'text': 'Never gonna give you up', 'startTime': 130.0, 'endTime': 133.0},
-                    {'text': 'Never gonna let you down', 'startTime': 133.0, 'endTime': 136.0},
-                    {'text': 'Never gonna run around and desert you', 'startTime': 136.0, 'endTime': 140.0},
-                    {'text': 'Never gonna make you cry', 'startTime': 140.0, 'endTime': 143.0},
-                    {'text': 'Never gonna say goodbye', 'startTime': 143.0, 'endTime': 146.0},
-                    {'text': 'Never gonna tell a lie and hurt you', 'startTime': 146.0, 'endTime': 150.0},
-                    {'text': '', 'startTime': 150.0, 'endTime': 160.0},  # Extended instrumental
-                    {'text': 'Never gonna give you up', 'startTime': 160.0, 'endTime': 163.0},
-                    {'text': 'Never gonna let you down', 'startTime': 163.0, 'endTime': 166.0},
-                    {'text': 'Never gonna run around and desert you', 'startTime': 166.0, 'endTime': 170.0},
-                    {'text': 'Never gonna make you cry', 'startTime': 170.0, 'endTime': 173.0},
-                    {'text': 'Never gonna say goodbye', 'startTime': 173.0, 'endTime': 176.0},
-                    {'text': 'Never gonna tell a lie and hurt you', 'startTime': 176.0, 'endTime': 180.0},
-                    {'text': '', 'startTime': 180.0, 'endTime': 190.0},  # Final instrumental
-                    {'text': 'Never gonna give you up', 'startTime': 190.0, 'endTime': 193.0},
-                    {'text': 'Never gonna let you down', 'startTime': 193.0, 'endTime': 196.0},
-                    {'text': 'Never gonna run around and desert you', 'startTime': 196.0, 'endTime': 200.0},
-                    {'text': 'Never gonna make you cry', 'startTime': 200.0, 'endTime': 203.0},
-                    {'text': 'Never gonna say goodbye', 'startTime': 203.0, 'endTime': 206.0},
-                    {'text': 'Never gonna tell a lie and hurt you', 'startTime': 206.0, 'endTime': 213.0}
-                ]
-            },
-            '9bZkp7q19f0': {
-                'lyrics': '''This is the way
-I love it
-This is the way
-I love it
-
-I love it when you call me big poppa
-Throw your hands in the air if you's a true player
-I love it when you call me big poppa
-To the honies getting money playing niggas like dummies''',
-                'synchronized': [
-                    {'text': 'This is the way', 'startTime': 0.0, 'endTime': 2.0},
-                    {'text': 'I love it', 'startTime': 2.0, 'endTime': 4.0},
-                    {'text': 'This is the way', 'startTime': 4.0, 'endTime': 6.0},
-                    {'text': 'I love it', 'startTime': 6.0, 'endTime': 8.0}
-                ]
-            },
-            'kJQP7kiw5Fk': {
-                'lyrics': '''Despacito
-Quiero respirar tu cuello despacito
-Deja que te diga cosas al oído
-Para que te acuerdes si no estás conmigo
-
-Despacito
-Quiero desnudarte a besos despacito
-Firmar las paredes de tu laberinto
-Y hacer de tu cuerpo todo un manuscrito''',
-                'synchronized': [
-                    {'text': 'Despacito', 'startTime': 0.0, 'endTime': 2.0},
-                    {'text': 'Quiero respirar tu cuello despacito', 'startTime': 2.0, 'endTime': 5.0},
-                    {'text': 'Deja que te diga cosas al oído', 'startTime': 5.0, 'endTime': 8.0},
-                    {'text': 'Para que te acuerdes si no estás conmigo', 'startTime': 8.0, 'endTime': 12.0}
-                ]
-            }
-        }
+        if not _VIDEO_ID_RE.fullmatch(video_id):
+            self.send_json_response({'error': 'Invalid video ID'}, 400)
+            return
         
         # Check if we have sample lyrics for this video
-        if video_id in sample_lyrics:
-            print(f"Using sample lyrics for video ID: {video_id}")
-            lyrics_data = sample_lyrics[video_id]
-            self.send_json_response({
-                'lyrics': lyrics_data['lyrics'],
-                'synchronized': lyrics_data['synchronized'],
-                'hasLyrics': True
-            })
+        payload = _SAMPLE_LYRICS_PAYLOADS.get(video_id)
+        if payload is not None:
+            etag = _SAMPLE_LYRICS_ETAGS[video_id]
+            cache_headers = (('ETag', etag), ('Cache-Control', f'public, max-age={SAMPLE_LYRICS_MAX_AGE}'))
+            if etag_matches(self.headers.get('If-None-Match', ''), etag):
+                self.send_not_modified(cache_headers)
+            else:
+                self.send_json_bytes(payload, headers=cache_headers)
             return
         
         # Try to get real lyrics from YouTube Music API
         if self.ytmusic:
+            payload = _LYRICS_CACHE.get(video_id)
+            if payload is not None:
+                self.send_json_bytes(payload)
+                return
             try:
-                # Check available methods
-                all_methods = [method for method in dir(self.ytmusic) if not method.startswith('_')]
-                lyrics_methods = [method for method in all_methods if 'lyric' in method.lower()]
-                print(f"All available methods: {all_methods}")
-                print(f"Lyrics-related methods: {lyrics_methods}")
-                
-                lyrics_data = None
-                
                 # Use the correct approach: get_watch_playlist to get lyrics ID, then get_lyrics
                 lyrics_data = None
+                # Only a lookup that completed may be remembered as "no lyrics"
+                lookup_ok = False
                 
                 try:
-                    print("Getting watch playlist to find lyrics ID")
                     watch_data = self.ytmusic.get_watch_playlist(video_id)
-                    print(f"Watch data keys: {watch_data.keys() if isinstance(watch_data, dict) else 'Not a dict'}")
                     
                     if isinstance(watch_data, dict) and 'lyrics' in watch_data:
                         lyrics_id = watch_data['lyrics']
-                        print(f"Found lyrics ID: {lyrics_id}")
                         
                         if lyrics_id and isinstance(lyrics_id, str) and len(lyrics_id) > 5:
-                            print("Getting actual lyrics using lyrics ID")
-                            lyrics_data = self.ytmusic.get_lyrics(lyrics_id)
-                            print(f"Lyrics data: {lyrics_data}")
-                            print(f"Lyrics data type: {type(lyrics_data)}")
-                        else:
-                            print("Invalid lyrics ID")
-                    else:
-                        print("No lyrics ID found in watch playlist")
+                            try:
+                                lyrics_data = self.ytmusic.get_lyrics(lyrics_id, timestamps=True)
+                            except TypeError:
+                                # ytmusicapi before 1.8 has no timed lyrics
+                                lyrics_data = self.ytmusic.get_lyrics(lyrics_id)
+                    lookup_ok = True
                         
                 except Exception as e:
-                    print(f"Error getting lyrics: {e}")
+                    logger.error("Error getting lyrics: %s", e)
                     lyrics_data = None
                 
                 if lyrics_data:
-                    print("Processing lyrics data...")
+                    # Handle TimedLyrics format; its 'lyrics' is a list of LyricLine, not text
+                    if isinstance(lyrics_data, dict) and lyrics_data.get('hasTimestamps'):
+                        lyrics_lines = [
+                            line for line in lyrics_data.get('lyrics') or []
+                            if hasattr(line, 'text') and hasattr(line, 'start_time') and hasattr(line, 'end_time')
+                        ]
+                        if lyrics_lines:
+                            # Convert milliseconds to seconds
+                            synchronized_lyrics = [
+                                {'text': line.text, 'startTime': line.start_time / 1000.0, 'endTime': line.end_time / 1000.0}
+                                for line in lyrics_lines
+                            ]
+                            lyrics_text = '\n'.join([line.text for line in lyrics_lines])
+                            
+                            if lyrics_text.strip():
+                                # Accept lyrics in any language for timed lyrics as well
+                                payload = json_dumps({
+                                    'lyrics': lyrics_text,
+                                    'synchronized': synchronized_lyrics,
+                                    'hasLyrics': True,
+                                    'source': lyrics_data.get('source', '')
+                                })
+                                _LYRICS_CACHE.set(video_id, payload)
+                                self.send_json_bytes(payload)
+                                return
                     
                     # Handle the standard ytmusicapi lyrics format
-                    if isinstance(lyrics_data, dict) and 'lyrics' in lyrics_data:
+                    elif isinstance(lyrics_data, dict) and 'lyrics' in lyrics_data:
                         lyrics_text = lyrics_data.get('lyrics', '')
                         source = lyrics_data.get('source', '')
                         
-                        print(f"Lyrics text length: {len(lyrics_text)}")
-                        print(f"Source: {source}")
-                        
                         if lyrics_text and lyrics_text.strip():
                             # Accept lyrics in any language; do not filter by English only
-                            self.send_json_response({
+                            payload = json_dumps({
                                 'lyrics': lyrics_text,
                                 'synchronized': [],
                                 'hasLyrics': True,
                                 'source': source
                             })
+                            _LYRICS_CACHE.set(video_id, payload)
+                            self.send_json_bytes(payload)
                             return
-                    
-                    # Handle TimedLyrics format (if available)
-                    elif hasattr(lyrics_data, 'hasTimestamps') and lyrics_data.get('hasTimestamps'):
-                        print("Processing TimedLyrics format")
-                        lyrics_lines = lyrics_data.get('lyrics', [])
-                        if lyrics_lines:
-                            synchronized_lyrics = []
-                            lyrics_text_lines = []
-                            
-                            for line in lyrics_lines:
-                                if hasattr(line, 'text') and hasattr(line, 'start_time') and hasattr(line, 'end_time'):
-                                    # Convert milliseconds to seconds
-                                    start_time = line.start_time / 1000.0
-                                    end_time = line.end_time / 1000.0
-                                    
-                                    synchronized_lyrics.append({
-                                        'text': line.text,
-                                        'startTime': start_time,
-                                        'endTime': end_time
-                                    })
-                                    lyrics_text_lines.append(line.text)
-                            
-                            lyrics_text = '\n'.join(lyrics_text_lines)
-                            
-                            if lyrics_text.strip():
-                                # Accept lyrics in any language for timed lyrics as well
-                                self.send_json_response({
-                                    'lyrics': lyrics_text,
-                                    'synchronized': [],
-                                    'hasLyrics': True
-                                })
-                                return
                 
                 # No lyrics found - return simple message
-                print(f"No real lyrics found for video ID: {video_id}")
-                
-                self.send_json_response({
+                payload = json_dumps({
                     'lyrics': 'No lyrics available for this song',
                     'synchronized': [],
                     'hasLyrics': False
                 })
+                if lookup_ok:
+                    _LYRICS_CACHE.set(video_id, payload, LYRICS_MISS_TTL)
+                self.send_json_bytes(payload)
                 return
                     
             except Exception as e:
-                print(f"Lyrics error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Lyrics error for %s", video_id)
                 # Fallback to no lyrics
                 self.send_json_response({
                     'lyrics': f'Unable to load lyrics for this song. Error: {str(e)}',
@@ -1130,148 +1615,94 @@ Y hacer de tu cuerpo todo un manuscrito''',
                 'hasLyrics': False
             })
 
-    def send_json_response(self, data: Dict[str, Any], status_code: int = 200) -> None:
+    def log_message(self, format: str, *args: Any) -> None:
+        """Write the access log through logging so LOG_LEVEL can turn it off"""
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s - %s", self.address_string(), format % args)
+
+    def log_error(self, format: str, *args: Any) -> None:
+        """Log 4xx/5xx responses, timeouts and bad request lines as warnings"""
+        logger.warning("%s - %s", self.address_string(), format % args)
+
+    def read_json_body(self) -> Any:
+        """Read and parse the JSON request body"""
+        content_length = int(self.headers.get('Content-Length', 0))
+        return json_loads(self.rfile.read(content_length))
+
+    def send_json_response(self, data: Dict[str, Any], status_code: int = 200,
+                           headers: Tuple[Tuple[str, str], ...] = ()) -> None:
         """Send JSON response with proper headers. Ignore client-abort errors."""
-        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_json_bytes(json_dumps(data), status_code, headers)
+
+    def send_json_bytes(self, payload: bytes, status_code: int = 200,
+                        headers: Tuple[Tuple[str, str], ...] = ()) -> None:
+        """Send an already-serialized JSON body, plus any extra headers"""
         try:
             self.send_response(status_code)
             self.send_header('Content-Type', 'application/json; charset=utf-8')
             self.send_header('Content-Length', str(len(payload)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            for name, value in _CORS_HEADERS + headers:
+                self.send_header(name, value)
             self.end_headers()
             self.wfile.write(payload)
         except (BrokenPipeError, ConnectionResetError):
             # Client disconnected before we could finish sending the response
             return
 
+    def send_not_modified(self, headers: Tuple[Tuple[str, str], ...] = ()) -> None:
+        """Send a bodiless 304 for a request whose cached copy is still current"""
+        try:
+            self.send_response(304)
+            for name, value in _CORS_HEADERS + headers:
+                self.send_header(name, value)
+            self.end_headers()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
     def handle_api_audio(self, query_string: str) -> None:
         """Extract a direct audio stream URL for a given YouTube videoId using yt-dlp."""
-        params = urllib.parse.parse_qs(query_string or '')
-        video_id = (params.get('videoId', [''])[0] or '').strip()
+        video_id = get_query_param(query_string or '', 'videoId').strip()
         if not video_id:
             self.send_json_response({'error': 'Video ID required'}, 400)
             return
+        if not _VIDEO_ID_RE.fullmatch(video_id):
+            self.send_json_response({'error': 'Invalid video ID'}, 400)
+            return
         if not YTDLP_AVAILABLE:
             self.send_json_response({'error': 'yt-dlp not installed on server'}, 501)
             return
         # Small in-memory cache to reduce extractor calls and rate limits
-        global _AUDIO_CACHE
-        try:
-            _AUDIO_CACHE
-        except NameError:
-            _AUDIO_CACHE = {}
-        import time as _t
-        now = int(_t.time())
         entry = _AUDIO_CACHE.get(video_id)
-        if entry and isinstance(entry, dict):
-            if now - entry.get('ts', 0) < 600 and entry.get('url'):  # 10 minutes TTL
-                self.send_json_response({
-                    'url': entry['url'],
-                    'abr': entry.get('abr'),
-                    'acodec': entry.get('acodec'),
-                    'ext': entry.get('ext'),
-                    'videoId': video_id,
-                    'cached': True
-                })
-                return
+        if entry:
+            self.send_json_response(dict(entry, videoId=video_id, cached=True))
+            return
         try:
-            url = f"https://www.youtube.com/watch?v={video_id}"
-            # Request best audio; never fallback to best video
-            ydl_opts = {
-                'format': 'bestaudio[acodec!=none]/bestaudio/best',
-                'quiet': True,
-                'nocheckcertificate': True,
-                'noplaylist': True,
-                'ignoreerrors': True,
-                'skip_download': True,
-                'cachedir': False,
-                'http_headers': {
-                    'User-Agent': YTDLP_UA,
-                    'Accept-Language': YTDLP_LANG,
-                    'Referer': 'https://www.youtube.com/'
-                }
-            }
-            # Attach cookies if provided (mitigates 429/age-gate)
-            temp_cookie_path = None
-            if YTDLP_COOKIES_PATH and os.path.exists(YTDLP_COOKIES_PATH):
-                ydl_opts['cookiefile'] = YTDLP_COOKIES_PATH
-            elif YTDLP_COOKIES_B64:
-                try:
-                    decoded = base64.b64decode(YTDLP_COOKIES_B64)
-                    fd, temp_cookie_path = tempfile.mkstemp(prefix='yt_cookies_', suffix='.txt')
-                    with os.fdopen(fd, 'wb') as f:
-                        f.write(decoded)
-                    ydl_opts['cookiefile'] = temp_cookie_path
-                except Exception as e:
-                    print(f"Failed to load cookies from env: {e}")
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-            if not info:
-                self.send_json_response({'error': 'Failed to extract audio'}, 502)
-                return
-            # If yt-dlp already selected a format, validate it is audio-only
-            top_url = info.get('url')
-            top_vcodec = info.get('vcodec')
-            top_acodec = info.get('acodec')
-            top_ext = info.get('ext')
-            if top_url and (top_vcodec == 'none' or not top_vcodec) and top_acodec:
-                self.send_json_response({'url': top_url, 'abr': info.get('abr'), 'acodec': top_acodec, 'ext': top_ext, 'videoId': video_id})
-                return
-            # Otherwise strictly pick formats with no video
-            stream_url = None
-            abr = None
-            acodec = None
-            ext = None
-            fmts = info.get('formats') or []
-            audio_only = [f for f in fmts if f and f.get('url') and (f.get('vcodec') == 'none' or not f.get('vcodec')) and f.get('acodec')]
-            # Strongly prefer m4a/aac for Safari/iOS support
-            m4a_like = [f for f in audio_only if (f.get('ext') == 'm4a') or ('mp4a' in str(f.get('acodec','')).lower()) or ('aac' in str(f.get('acodec','')).lower())]
-            webm_like = [f for f in audio_only if f not in m4a_like]
-            # Sort by bitrate within each group
-            m4a_like.sort(key=lambda f: (f.get('abr') or 0), reverse=True)
-            webm_like.sort(key=lambda f: (f.get('abr') or 0), reverse=True)
-            chosen = (m4a_like[0] if m4a_like else (webm_like[0] if webm_like else None))
-            if chosen:
-                best = chosen
-                stream_url = best.get('url')
-                abr = best.get('abr')
-                acodec = best.get('acodec')
-                ext = best.get('ext')
-            if not stream_url:
-                self.send_json_response({'error': 'No audio-only stream found'}, 502)
-                return
-            # Cache and respond
-            _AUDIO_CACHE[video_id] = {'url': stream_url, 'abr': abr, 'acodec': acodec, 'ext': ext, 'ts': now}
-            self.send_json_response({'url': stream_url, 'abr': abr, 'acodec': acodec, 'ext': ext, 'videoId': video_id})
+            data, status_code = resolve_audio_stream(video_id)
         except Exception as e:
-            print(f"yt-dlp extraction error for {video_id}: {e}")
+            logger.error("Audio resolve error for %s: %s", video_id, e)
             self.send_json_response({'error': 'Audio extraction failed'}, 500)
-        finally:
-            # Cleanup temp cookie file if created
-            try:
-                if temp_cookie_path and os.path.exists(temp_cookie_path):
-                    os.remove(temp_cookie_path)
-            except Exception:
-                pass
+            return
+        if status_code == 200:
+            data = dict(data, videoId=video_id)
+        self.send_json_response(data, status_code)
 
     def do_OPTIONS(self):  # noqa: N802 (keep stdlib naming)
         """Handle CORS preflight requests"""
         try:
             self.send_response(200)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            for name, value in _CORS_HEADERS:
+                self.send_header(name, value)
+            # Lets keep-alive clients know the (empty) body is complete
+            self.send_header('Content-Length', '0')
             self.end_headers()
         except (BrokenPipeError, ConnectionResetError):
             return
 
 if __name__ == '__main__':
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
     # Initialize database
     init_database()
     
-    import argparse
     parser = argparse.ArgumentParser(description='Wave Music Streaming Server')
     parser.add_argument('--port', type=int, default=5000, help='Port to run the server on')
     args = parser.parse_args()
@@ -1284,8 +1715,10 @@ if __name__ == '__main__':
     print(f"💾 Database: SQLite ({DB_PATH})")
     print("🚀 Ready to serve music!")
     
+    # Stop the same way on SIGTERM (docker stop, systemd) as on Ctrl+C
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
     try:
-        with ThreadingTCPServer(('0.0.0.0', port), YTMusicRequestHandler) as httpd:
+        with PooledTCPServer(('0.0.0.0', port), YTMusicRequestHandler) as httpd:
             httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n👋 Server stopped gracefully")